@@ -5,12 +5,119 @@ Comprehensive testing suite with multiple validation options
 """
 
 import argparse
+import functools
+import hashlib
+import importlib.util
+import io
 import sys
 import os
-import subprocess
+import shutil
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from importlib.metadata import PackageNotFoundError, distribution
 from pathlib import Path
 
+TEST_DB = "test_jira.db"
+FIXTURE_FINGERPRINT = f"{TEST_DB}.fingerprint"
+GENERATOR_SOURCE = "test_data_generator.py"
+
+# PI-filtered dashboard queries; the PI is always a bound parameter
+SUMMARY_SQL = """
+    SELECT 
+        COUNT(*) as total_features,
+        COUNT(CASE WHEN status = 'Done' THEN 1 END) as completed_features
+    FROM issues 
+    WHERE issuetype = 'Feature' AND pi = ?
+"""
+
+ARTS_SQL = """
+    SELECT 
+        art,
+        COUNT(*) as count
+    FROM issues 
+    WHERE issuetype = 'Feature' AND pi = ? AND art IS NOT NULL
+    GROUP BY art
+"""
+
+def _count_query(query):
+    """Wrap a query so DuckDB returns only its row count, not the rows"""
+    return f"SELECT COUNT(*) FROM ({query}) t"
+
+def _row_count(conn, query, params=None):
+    """Count a query's result rows without materializing them in Python"""
+    return conn.execute(_count_query(query), params or []).fetchone()[0]
+
+class StageOutput:
+    """Stream proxy that sends each stage thread's writes to that stage's buffer"""
+    
+    # Shared by the stdout and stderr proxies so a stage's output stays in order
+    _local = threading.local()
+    
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def _target(self):
+        buffer = getattr(self._local, "buffer", None)
+        return buffer if buffer is not None else self.stream
+    
+    def write(self, text):
+        return self._target().write(text)
+    
+    def flush(self):
+        self._target().flush()
+    
+    def __getattr__(self, name):
+        # encoding, isatty, fileno etc. come from the real stream
+        return getattr(self.stream, name)
+    
+    @classmethod
+    def capture(cls, stage):
+        """Run a stage in the calling thread, returning its result and buffered output"""
+        cls._local.buffer = io.StringIO()
+        try:
+            passed = stage()
+        except Exception as e:
+            print(f"❌ Stage crashed: {e}")
+            passed = False
+        finally:
+            output = cls._local.buffer.getvalue()
+            cls._local.buffer = None
+        return passed, output
+
+def run_stages(stages):
+    """Run independent test stages in parallel, printing each stage's output as it finishes"""
+    if not stages:
+        return True
+    
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = StageOutput(stdout), StageOutput(stderr)
+    all_passed = True
+    
+    try:
+        with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+            futures = {executor.submit(StageOutput.capture, stage): name for name, stage in stages}
+            for future in as_completed(futures):
+                passed, stage_output = future.result()
+                stdout.write(stage_output)
+                stdout.flush()
+                if not passed:
+                    all_passed = False
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+    
+    return all_passed
+
+def _is_installed(package):
+    """Check a package is installed from its metadata, without importing it"""
+    try:
+        distribution(package)
+        return True
+    except PackageNotFoundError:
+        # Fall back to the import system for packages whose distribution name differs
+        return importlib.util.find_spec(package) is not None
+
 def check_dependencies():
     """Check if required dependencies are installed"""
     required_packages = [
@@ -20,12 +127,7 @@ def check_dependencies():
         'marimo'
     ]
     
-    missing = []
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing.append(package)
+    missing = [package for package in required_packages if not _is_installed(package)]
     
     if missing:
         print(f"❌ Missing required packages: {', '.join(missing)}")
@@ -35,18 +137,52 @@ def check_dependencies():
     print("✅ All dependencies installed")
     return True
 
+@functools.lru_cache(maxsize=1)
+def _generator_class():
+    """Test data generator class, imported once per run"""
+    from test_data_generator import JiraTestDataGenerator
+    return JiraTestDataGenerator
+
+def _generator():
+    """Freshly seeded generator, so every database gets identical data"""
+    return _generator_class()()
+
+def _fixture_fingerprint():
+    """Hash of the generator source the cached test database was built from"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(Path(GENERATOR_SOURCE).read_bytes())
+    return digest.hexdigest()
+
+def remove_test_fixture():
+    """Delete the cached test database and its fingerprint"""
+    for path in (TEST_DB, FIXTURE_FINGERPRINT):
+        if os.path.exists(path):
+            os.remove(path)
+    print("🧹 Removed cached test database")
+
 def generate_test_data():
-    """Generate test database"""
+    """Generate test database, reusing the cached one when caching is enabled"""
+    cache_enabled = os.environ.get("SAFE_PI_CACHE_FIXTURE") == "1"
+    
+    if cache_enabled and os.path.exists(TEST_DB) and os.path.exists(FIXTURE_FINGERPRINT):
+        if Path(FIXTURE_FINGERPRINT).read_text().strip() == _fixture_fingerprint():
+            print(f"✅ Reusing cached test DB: {TEST_DB}")
+            return True
+    
     print("🔧 Generating test data...")
     
     try:
-        from test_data_generator import JiraTestDataGenerator
+        # DuckDB refuses to open a stale file left by a previous run
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
         
-        generator = JiraTestDataGenerator()
-        conn = generator.create_test_database("test_jira.db")
+        conn = _generator().create_test_database(TEST_DB)
         conn.close()
         
-        print("✅ Test data generated: test_jira.db")
+        if cache_enabled:
+            Path(FIXTURE_FINGERPRINT).write_text(_fixture_fingerprint())
+        
+        print(f"✅ Test data generated: {TEST_DB}")
         return True
     except Exception as e:
         print(f"❌ Failed to generate test data: {e}")
@@ -72,27 +208,28 @@ def test_marimo_notebook():
         print(f"❌ Dashboard file not found: {dashboard_file}")
         return False
     
+    # Compiling the source first catches syntax errors without loading marimo
     try:
-        # Test if marimo can parse the notebook
-        result = subprocess.run(
-            ["python", "-c", f"import marimo; app = marimo.load('{dashboard_file}')"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        compile(Path(dashboard_file).read_text(encoding="utf-8"), dashboard_file, "exec")
+    except SyntaxError as e:
+        print(f"❌ Marimo notebook has syntax errors: {e}")
+        return False
+    
+    try:
+        import marimo
         
-        if result.returncode == 0:
-            print("✅ Marimo notebook syntax is valid")
-            return True
-        else:
-            print(f"❌ Marimo notebook has syntax errors: {result.stderr}")
+        # Importing the notebook defines its cells without running them
+        spec = importlib.util.spec_from_file_location("safe_pi_dashboard", dashboard_file)
+        notebook = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(notebook)
+        if not isinstance(getattr(notebook, "app", None), marimo.App):
+            print("❌ Marimo notebook does not define a marimo.App named app")
             return False
-            
-    except subprocess.TimeoutExpired:
-        print("❌ Marimo notebook test timed out")
-        return False
-    except FileNotFoundError:
-        print("❌ Marimo not installed or not in PATH")
+        
+        print("✅ Marimo notebook syntax is valid")
+        return True
+    except ImportError:
+        print("❌ Marimo not installed")
         print("Install with: pip install marimo")
         return False
     except Exception as e:
@@ -105,11 +242,11 @@ def test_sql_queries():
     
     try:
         import duckdb
-        from test_data_generator import JiraTestDataGenerator
         
-        # Create temporary test database
-        generator = JiraTestDataGenerator()
-        conn = generator.create_test_database(":memory:")
+        # Create temporary test database on disk and query it read-only
+        temp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(temp_dir, "sql_tests.db")
+        _generator().create_test_database(db_path).close()
         
         # Test queries from the dashboard
         test_queries = {
@@ -159,7 +296,8 @@ def test_sql_queries():
                     FROM issues f
                     JOIN changelog c ON f.key = c.issue_key
                     WHERE f.issuetype = 'Feature' 
-                      AND c.to_status = 'Done'
+                      AND c.field = 'status'
+                      AND c.to_value = 'Done'
                       AND f.labels LIKE '%PI-2024-Q3%'
                       AND c.changed_date >= CURRENT_DATE - INTERVAL '12 weeks'
                       AND f.workstream IS NOT NULL
@@ -182,16 +320,36 @@ def test_sql_queries():
         passed = 0
         failed = 0
         
-        for query_name, query in test_queries.items():
+        def count_rows(item):
+            query_name, query = item
             try:
-                result = conn.execute(query).fetchall()
-                print(f"  ✅ {query_name}: {len(result)} rows")
-                passed += 1
+                return query_name, _row_count(conn, query), None
             except Exception as e:
-                print(f"  ❌ {query_name}: {e}")
-                failed += 1
+                return query_name, None, e
         
-        conn.close()
+        conn = duckdb.connect(db_path, read_only=True, config={'threads': os.cpu_count() or 1})
+        try:
+            # Validate every query in a single statement that only returns row counts
+            batch = "SELECT " + ",\n".join(
+                f"(SELECT COUNT(*) FROM ({query}) t{i})" for i, query in enumerate(test_queries.values())
+            )
+            try:
+                counts = conn.execute(batch).fetchone()
+                results = [(name, count, None) for name, count in zip(test_queries, counts)]
+            except Exception:
+                # Something failed to bind or run; rerun individually to pinpoint it
+                results = [count_rows(item) for item in test_queries.items()]
+        finally:
+            conn.close()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        
+        for query_name, row_count, error in results:
+            if error is None:
+                print(f"  ✅ {query_name}: {row_count} rows")
+                passed += 1
+            else:
+                print(f"  ❌ {query_name}: {error}")
+                failed += 1
         
         print(f"📊 SQL Tests: {passed} passed, {failed} failed")
         return failed == 0
@@ -204,7 +362,7 @@ def test_dashboard_with_real_data():
     """Test dashboard with generated test data"""
     print("🚀 Testing dashboard with test data...")
     
-    if not os.path.exists("test_jira.db"):
+    if not os.path.exists(TEST_DB):
         print("❌ Test database not found. Run with --generate-data first.")
         return False
     
@@ -212,24 +370,24 @@ def test_dashboard_with_real_data():
         import duckdb
         
         # Connect to test database and run sample queries
-        conn = duckdb.connect("test_jira.db")
+        conn = duckdb.connect(TEST_DB, read_only=True, config={'threads': os.cpu_count() or 1})
         
         # Test database integrity
-        tables = conn.execute("SHOW TABLES").fetchall()
+        tables = {t[0] for t in conn.execute("SHOW TABLES").fetchall()}
         expected_tables = ['issues', 'changelog', 'issue_links']
         
-        for table in expected_tables:
-            if table not in [t[0] for t in tables]:
-                print(f"❌ Missing table: {table}")
-                return False
+        missing_tables = [table for table in expected_tables if table not in tables]
+        if missing_tables:
+            print(f"❌ Missing table: {', '.join(missing_tables)}")
+            return False
         
         # Test sample dashboard queries
         try:
             # Test PI selection
             pis = conn.execute("""
-                SELECT DISTINCT REGEXP_EXTRACT(labels, 'PI-([^,]+)') as pi
+                SELECT DISTINCT pi
                 FROM issues 
-                WHERE issuetype = 'Feature' AND labels LIKE '%PI-%'
+                WHERE issuetype = 'Feature' AND pi IS NOT NULL
                 ORDER BY pi DESC
             """).fetchall()
             
@@ -237,37 +395,27 @@ def test_dashboard_with_real_data():
                 print("❌ No PIs found in test data")
                 return False
             
-            print(f"  ✅ Found {len(pis)} PIs: {[f'PI-{p[0]}' for p in pis[:3]]}")
+            print(f"  ✅ Found {len(pis)} PIs: {[p[0] for p in pis[:3]]}")
             
             # Test with first PI
-            test_pi = f"PI-{pis[0][0]}"
+            test_pi = pis[0][0]
             
             # Test executive summary
-            summary = conn.execute(f"""
-                SELECT 
-                    COUNT(*) as total_features,
-                    COUNT(CASE WHEN status = 'Done' THEN 1 END) as completed_features
-                FROM issues 
-                WHERE issuetype = 'Feature' AND labels LIKE '%{test_pi}%'
-            """).fetchone()
+            summary = conn.execute(SUMMARY_SQL, [test_pi]).fetchone()
             
             total, completed = summary
+            if total == 0:
+                print(f"❌ No features found for {test_pi}")
+                return False
             print(f"  ✅ {test_pi}: {completed}/{total} features completed")
             
             # Test ART breakdown
-            arts = conn.execute(f"""
-                SELECT 
-                    REGEXP_EXTRACT(labels, 'ART-([^,]+)') as art,
-                    COUNT(*) as count
-                FROM issues 
-                WHERE issuetype = 'Feature' 
-                  AND labels LIKE '%{test_pi}%'
-                  AND REGEXP_EXTRACT(labels, 'ART-([^,]+)') IS NOT NULL
-                GROUP BY REGEXP_EXTRACT(labels, 'ART-([^,]+)')
-            """).fetchall()
+            art_count = _row_count(conn, ARTS_SQL, [test_pi])
             
-            if arts:
-                print(f"  ✅ Found {len(arts)} ARTs with features")
+            if art_count == 0:
+                print(f"❌ No ARTs found for {test_pi}")
+                return False
+            print(f"  ✅ Found {art_count} ARTs with features")
             
             conn.close()
             print("✅ Dashboard data validation passed")
@@ -292,6 +440,7 @@ Quick start demo with test data
 import os
 import subprocess
 import sys
+from pathlib import Path
 
 def main():
     print("🚀 SAFe PI Dashboard Demo")
@@ -308,19 +457,18 @@ def main():
         print("✅ Test data generated")
     
     # Update dashboard to use test database
-    dashboard_file = "safe_pi_dashboard.py"
-    if os.path.exists(dashboard_file):
-        with open(dashboard_file, 'r') as f:
-            content = f.read()
-        
+    dashboard_file = Path("safe_pi_dashboard.py")
+    if dashboard_file.exists():
         # Replace connection string
-        updated_content = content.replace(
-            'conn = duckdb.connect()  # or duckdb.connect("path/to/your/jira.db")',
-            'conn = duckdb.connect("test_jira.db")'
+        updated_content = dashboard_file.read_bytes().replace(
+            b'conn = duckdb.connect(config=db_config)  # or duckdb.connect("path/to/your/jira.db", read_only=True, config=db_config)',
+            b'conn = duckdb.connect("test_jira.db", read_only=True, config=db_config)'
         )
         
-        with open("demo_dashboard.py", 'w') as f:
-            f.write(updated_content)
+        # Only rewrite the demo dashboard when it is out of date
+        demo_dashboard = Path("demo_dashboard.py")
+        if not demo_dashboard.exists() or demo_dashboard.read_bytes() != updated_content:
+            demo_dashboard.write_bytes(updated_content)
         
         print("✅ Demo dashboard created: demo_dashboard.py")
     
@@ -341,16 +489,25 @@ if __name__ == "__main__":
     main()
 '''
     
-    with open("demo.py", "w") as f:
-        f.write(demo_content)
+    # Skip the write when demo.py was already generated from this template
+    demo_script = Path("demo.py")
+    hash_file = Path("demo.py.hash")
+    content_hash = hashlib.blake2b(demo_content.encode(), digest_size=16).hexdigest()
     
-    os.chmod("demo.py", 0o755)
+    if demo_script.exists() and hash_file.exists() and hash_file.read_text() == content_hash:
+        print("✅ Demo script up to date: demo.py")
+        return
+    
+    demo_script.write_text(demo_content)
+    demo_script.chmod(0o755)
+    hash_file.write_text(content_hash)
     print("✅ Demo script created: demo.py")
 
 def main():
     parser = argparse.ArgumentParser(description="Test runner for SAFe PI Dashboard")
     parser.add_argument("--quick", action="store_true", help="Run quick tests only")
     parser.add_argument("--generate-data", action="store_true", help="Generate test data")
+    parser.add_argument("--rebuild-fixture", action="store_true", help="Delete the cached test database")
     parser.add_argument("--unit-tests", action="store_true", help="Run unit tests only")
     parser.add_argument("--sql-tests", action="store_true", help="Run SQL tests only")
     parser.add_argument("--marimo-test", action="store_true", help="Test marimo notebook")
@@ -372,30 +529,35 @@ def main():
     if not check_dependencies():
         return 1
     
+    if args.rebuild_fixture:
+        remove_test_fixture()
+    
     # Generate test data if requested or if running all tests
     if args.generate_data or args.all:
         if not generate_test_data():
             all_passed = False
     
+    # Collect the independent test stages; they run concurrently once the data exists
+    stages = []
+    
     # Run SQL tests
     if args.sql_tests or args.all:
-        if not test_sql_queries():
-            all_passed = False
+        stages.append(("SQL tests", test_sql_queries))
     
     # Run unit tests
     if args.unit_tests or args.all or args.quick:
-        if not run_unit_tests():
-            all_passed = False
+        stages.append(("Unit tests", run_unit_tests))
     
     # Test marimo notebook
     if args.marimo_test or args.all:
-        if not test_marimo_notebook():
-            all_passed = False
+        stages.append(("Marimo notebook", test_marimo_notebook))
     
     # Test with real data
     if args.all and not args.quick:
-        if not test_dashboard_with_real_data():
-            all_passed = False
+        stages.append(("Real data", test_dashboard_with_real_data))
+    
+    if not run_stages(stages):
+        all_passed = False
     
     # Create demo script
     if args.demo or args.all:
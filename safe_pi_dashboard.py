@@ -19,29 +19,67 @@ def __():
     from plotly.subplots import make_subplots
     import numpy as np
     from datetime import datetime, timedelta
+    import functools
+    import os
     import re
-    return datetime, duckdb, go, make_subplots, mo, np, pd, px, re, timedelta
+    return (
+        datetime,
+        duckdb,
+        functools,
+        go,
+        make_subplots,
+        mo,
+        np,
+        os,
+        pd,
+        px,
+        re,
+        timedelta,
+    )
 
 
 @app.cell
-def __(duckdb):
+def __(duckdb, os):
     """
     ## Database Connection Setup
     """
+    # One connection is shared by every cell; give DuckDB all cores for the scans and
+    # window queries, an explicit buffer pool, and keep cached objects between reruns
+    db_config = {
+        'threads': os.cpu_count() or 1,
+        'memory_limit': '4GB',
+        'enable_object_cache': True
+    }
+    
     # Initialize DuckDB connection
     # Replace with your actual database path
-    conn = duckdb.connect()  # or duckdb.connect("path/to/your/jira.db")
+    conn = duckdb.connect(config=db_config)  # or duckdb.connect("path/to/your/jira.db", read_only=True, config=db_config)
     
     # Test connection and show available tables
     try:
         tables = conn.execute("SHOW TABLES").fetchall()
         table_names = [t[0] for t in tables] if tables else ["No tables found"]
         print(f"✅ Connected to database. Available tables: {table_names}")
+        
+        # Key the issues by their PI and ART labels in an indexed temp table so filters are
+        # equality lookups; the source database is never written, so it may be read-only.
+        # Labels are a comma-separated list, so splitting and prefix matching finds them
+        # without running a regex over every row
+        if "issues" in table_names:
+            conn.execute("""
+            CREATE OR REPLACE TEMP TABLE issues_keyed AS
+            SELECT 
+                COLUMNS(c -> c NOT IN ('pi', 'art')),
+                list_filter(list_transform(string_split(labels, ','), x -> trim(x)), x -> starts_with(x, 'PI-'))[1] as pi,
+                list_filter(list_transform(string_split(labels, ','), x -> trim(x)), x -> starts_with(x, 'ART-'))[1] as art
+            FROM issues
+            """)
+            conn.execute("CREATE INDEX idx_issues_keyed_pi ON issues_keyed(pi, issuetype)")
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         table_names = []
     
-    return conn, table_names, tables
+    return conn, db_config, table_names, tables
 
 
 @app.cell
@@ -49,42 +87,23 @@ def __(conn, mo):
     """
     ## Interactive Controls
     """
-    # Get available PIs from the database
+    # Get the available PIs, ARTs and workstreams in a single scan of the features
     try:
-        pi_query = """
-        SELECT DISTINCT REGEXP_EXTRACT(labels, 'PI-([^,]+)') as pi
-        FROM issues 
-        WHERE issuetype = 'Feature' AND labels LIKE '%PI-%'
-        ORDER BY pi DESC
+        controls_query = """
+        SELECT 
+            LIST(DISTINCT pi ORDER BY pi DESC) FILTER (WHERE pi IS NOT NULL) as pis,
+            LIST(DISTINCT art ORDER BY art) FILTER (WHERE art IS NOT NULL) as arts,
+            LIST(DISTINCT workstream ORDER BY workstream) FILTER (WHERE workstream IS NOT NULL) as workstreams
+        FROM issues_keyed 
+        WHERE issuetype = 'Feature'
         """
-        available_pis = [row[0] for row in conn.execute(pi_query).fetchall()]
-        available_pis = [f"PI-{pi}" for pi in available_pis if pi]
+        _pis, _arts, _workstreams = conn.execute(controls_query).fetchone()
+        available_pis = _pis or []
+        available_arts = _arts or []
+        available_workstreams = _workstreams or []
     except:
         available_pis = ["PI-2024-Q3", "PI-2024-Q4", "PI-2025-Q1"]
-    
-    # Get available ARTs
-    try:
-        art_query = """
-        SELECT DISTINCT REGEXP_EXTRACT(labels, 'ART-([^,]+)') as art
-        FROM issues 
-        WHERE issuetype = 'Feature' AND labels LIKE '%ART-%'
-        ORDER BY art
-        """
-        available_arts = [row[0] for row in conn.execute(art_query).fetchall()]
-        available_arts = [art for art in available_arts if art]
-    except:
-        available_arts = ["Platform", "Commerce", "Analytics"]
-    
-    # Get available workstreams
-    try:
-        workstream_query = """
-        SELECT DISTINCT workstream
-        FROM issues 
-        WHERE workstream IS NOT NULL AND issuetype = 'Feature'
-        ORDER BY workstream
-        """
-        available_workstreams = [row[0] for row in conn.execute(workstream_query).fetchall()]
-    except:
+        available_arts = ["ART-Platform", "ART-Commerce", "ART-Analytics"]
         available_workstreams = ["Team-Alpha", "Team-Beta", "Team-Gamma"]
     
     # Create interactive controls
@@ -118,64 +137,375 @@ def __(conn, mo):
     {mo.hstack([selected_arts, selected_workstreams])}
     """)
     return (
-        art_query,
         available_arts,
         available_pis,
         available_workstreams,
-        pi_query,
+        controls_query,
         refresh_data,
         selected_arts,
         selected_pi,
         selected_workstreams,
-        workstream_query,
     )
 
 
 @app.cell
-def __(conn, mo, selected_arts, selected_pi, selected_workstreams):
+def __(conn, refresh_data):
     """
-    ## Executive Summary Metrics
+    ## Pre-aggregated PI Metrics
     """
-    # Build filter conditions
-    pi_filter = selected_pi.value
-    art_filter = "', '".join([f"ART-{art}" for art in selected_arts.value])
-    workstream_filter = "', '".join(selected_workstreams.value)
+    # Rebuilt on every refresh so the metric cells below filter narrow feature rows
+    # instead of rescanning every keyed issue
+    refresh_data
     
-    # Executive summary query
-    summary_query = f"""
-    WITH pi_features AS (
+    # PI labels name calendar quarters, e.g. PI-2024-Q3 runs from 2024-07-01 to 2024-09-30
+    conn.execute("""
+    CREATE OR REPLACE TEMP TABLE pi_calendar AS
+    SELECT 
+        pi,
+        MAKE_DATE(pi_year, 3 * pi_quarter - 2, 1) as pi_start_date,
+        CAST(MAKE_DATE(pi_year, 3 * pi_quarter - 2, 1) + INTERVAL 3 MONTH - INTERVAL 1 DAY AS DATE) as pi_end_date
+    FROM (
+        SELECT 
+            pi,
+            TRY_CAST(REGEXP_EXTRACT(pi, '^PI-([0-9]{4})-Q[1-4]$', 1) AS INTEGER) as pi_year,
+            TRY_CAST(REGEXP_EXTRACT(pi, '^PI-[0-9]{4}-Q([1-4])$', 1) AS INTEGER) as pi_quarter
+        FROM (SELECT DISTINCT pi FROM issues_keyed WHERE pi IS NOT NULL)
+    )
+    WHERE pi_year IS NOT NULL AND pi_quarter IS NOT NULL
+    """)
+    
+    # Features created after their PI started were added to scope mid-PI; the flag is
+    # stored as a TINYINT code into COMMITMENT_TYPES and labelled only for plotting
+    COMMITMENT_TYPES = ['Added', 'Committed']
+    conn.execute("""
+    CREATE OR REPLACE TEMP TABLE pi_features_mv AS
+    SELECT 
+        i.key,
+        i.workstream,
+        i.status,
+        i.created_date,
+        i.resolved_date,
+        i.story_points,
+        i.pi,
+        i.art,
+        COALESCE(CAST(i.created_date <= pc.pi_start_date AS TINYINT), 0) as commitment_type
+    FROM issues_keyed i
+    LEFT JOIN pi_calendar pc ON i.pi = pc.pi
+    WHERE i.issuetype = 'Feature'
+    """)
+    conn.execute("CREATE INDEX idx_pi_features_mv ON pi_features_mv(pi, art, workstream)")
+    
+    # Feature completions joined to the changelog once for throughput and burnup
+    conn.execute("""
+    CREATE OR REPLACE TEMP TABLE pi_completions_mv AS
+    SELECT 
+        f.key,
+        f.workstream,
+        f.pi,
+        c.changed_date
+    FROM pi_features_mv f
+    JOIN changelog c ON f.key = c.issue_key
+    WHERE c.field = 'status' AND c.to_value = 'Done'
+    """)
+    pi_metrics_ready = True
+    return COMMITMENT_TYPES, pi_metrics_ready
+
+
+@app.cell
+def __():
+    """
+    ## Dashboard Queries
+    """
+    # SQL is defined once per query name; cells bind their filters as ? (or $n) parameters
+    # so DuckDB never sees user-selected values spliced into the query text
+    QUERIES = {
+        "pi_metrics": """
+        SELECT 
+            CASE GROUPING(art, workstream, commitment_type)
+                WHEN 7 THEN 'summary'
+                WHEN 3 THEN 'art'
+                ELSE 'scope'
+            END as metric_level,
+            art,
+            workstream,
+            commitment_type,
+            COUNT(*) FILTER (WHERE workstream IN $1) as total_features,
+            COUNT(*) FILTER (WHERE workstream IN $1 AND status = 'Done') as completed_features,
+            COUNT(*) FILTER (WHERE workstream IN $1 AND status IN ('In Progress', 'In Review')) as in_progress_features,
+            COUNT(*) FILTER (WHERE workstream IN $1 AND status = 'To Do') as todo_features,
+            COUNT(DISTINCT workstream) FILTER (WHERE workstream IN $1) as active_workstreams,
+            ROUND(100.0 * completed_features / NULLIF(total_features, 0), 1) as completion_rate,
+            COUNT(*) as feature_count,
+            COUNT(*) FILTER (WHERE status = 'Done') as completed_count,
+            ROUND(100.0 * completed_count / feature_count, 1) as scope_completion_rate
+        FROM pi_features_mv 
+        WHERE pi = $2
+        GROUP BY GROUPING SETS ((), (art), (workstream, commitment_type))
+        """,
+        "workstream_throughput": """
+        SELECT 
+            workstream,
+            DATE_TRUNC('week', changed_date) as week,
+            COUNT(DISTINCT key) as features_completed
+        FROM pi_completions_mv
+        WHERE pi = ?
+          AND changed_date >= CURRENT_DATE - INTERVAL '12 weeks'
+          AND workstream IN ?
+        GROUP BY workstream, DATE_TRUNC('week', changed_date)
+        ORDER BY workstream, week
+        """,
+        "lead_time_distribution": """
+        WITH lead_times AS (
+            SELECT 
+                workstream,
+                key,
+                date_diff('day', created_date, resolved_date) as lead_time_days
+            FROM pi_features_mv 
+            WHERE status = 'Done'
+              AND pi = ?
+              AND resolved_date IS NOT NULL
+              AND workstream IN ?
+        )
         SELECT 
-            key,
-            status,
             workstream,
-            labels,
-            created_date,
-            resolved_date
-        FROM issues 
-        WHERE issuetype = 'Feature' 
-          AND labels LIKE '%{pi_filter}%'
-          AND workstream IN ('{workstream_filter}')
-    ),
-    summary_stats AS (
+            key,
+            lead_time_days,
+            QUANTILE_CONT(lead_time_days, 0.50) OVER (PARTITION BY workstream) as p50_lead_time,
+            QUANTILE_CONT(lead_time_days, 0.85) OVER (PARTITION BY workstream) as p85_lead_time
+        FROM lead_times
+        ORDER BY workstream, lead_time_days
+        """,
+        "pi_burnup_data": """
+        WITH daily_completions AS (
+            SELECT 
+                DATE_TRUNC('day', changed_date) as completion_date,
+                COUNT(*) as features_completed_today
+            FROM pi_completions_mv
+            WHERE pi = ?
+            GROUP BY DATE_TRUNC('day', changed_date)
+        )
         SELECT 
-            COUNT(*) as total_features,
-            COUNT(CASE WHEN status = 'Done' THEN 1 END) as completed_features,
-            COUNT(CASE WHEN status IN ('In Progress', 'In Review') THEN 1 END) as in_progress_features,
-            COUNT(CASE WHEN status = 'To Do' THEN 1 END) as todo_features,
-            COUNT(DISTINCT workstream) as active_workstreams
-        FROM pi_features
+            completion_date,
+            CAST(SUM(features_completed_today) OVER (ORDER BY completion_date) AS BIGINT) as cumulative_completed,
+            (SELECT COUNT(*) FROM pi_features_mv WHERE pi = ?) as total_planned
+        FROM daily_completions
+        ORDER BY completion_date
+        """,
+        "cross_art_dependencies": """
+        WITH art_dependencies AS (
+            SELECT 
+                i1.art as source_art,
+                i2.art as target_art,
+                i1.key as source_key,
+                i2.key as target_key,
+                i2.status as target_status
+            FROM pi_features_mv i1
+            JOIN issue_links il ON i1.key = il.source_key
+            JOIN pi_features_mv i2 ON il.target_key = i2.key
+            WHERE i1.pi = ?
+              AND i2.pi = ?
+              AND i1.art IS NOT NULL
+              AND i2.art IS NOT NULL
+        )
+        SELECT 
+            source_art,
+            target_art,
+            COUNT(*) as dependency_count,
+            COUNT(*) FILTER (WHERE target_status = 'Done') as resolved_dependencies,
+            ROUND(100.0 * resolved_dependencies / dependency_count, 1) as resolution_rate
+        FROM art_dependencies
+        WHERE source_art != target_art
+        GROUP BY source_art, target_art
+        ORDER BY dependency_count DESC
+        """,
+        "unplanned_work": """
+        WITH pi_window AS (
+            SELECT 
+                selected.pi,
+                pc.pi_start_date,
+                pc.pi_end_date
+            FROM (SELECT ? as pi) selected
+            LEFT JOIN pi_calendar pc ON selected.pi = pc.pi
+        ),
+        work_classification AS (
+            SELECT 
+                i.workstream,
+                i.issuetype,
+                CAST(CASE 
+                    WHEN i.pi = w.pi THEN 0
+                    WHEN i.resolved_date BETWEEN w.pi_start_date AND w.pi_end_date THEN 1
+                    ELSE 2
+                END AS TINYINT) as work_classification,
+                i.story_points
+            FROM issues_keyed i
+            CROSS JOIN pi_window w
+            WHERE (i.resolved_date BETWEEN w.pi_start_date AND w.pi_end_date
+                   OR i.pi = w.pi)
+              AND i.issuetype IN ('Feature', 'Story', 'Bug', 'Task')
+              AND i.workstream IS NOT NULL
+        )
+        SELECT 
+            workstream,
+            work_classification,
+            issuetype,
+            COUNT(*) as issue_count,
+            CAST(SUM(COALESCE(story_points, 0)) AS BIGINT) as total_story_points
+        FROM work_classification
+        GROUP BY workstream, work_classification, issuetype
+        ORDER BY workstream, work_classification, issue_count DESC
+        """,
+    }
+    
+    # Labels for the work_classification codes returned by unplanned_work
+    WORK_CLASSIFICATIONS = ['PI-Committed', 'Unplanned-Delivered', 'Outside-Scope']
+    return QUERIES, WORK_CLASSIFICATIONS
+
+
+@app.cell
+def __(QUERIES, conn, functools, pd, pi_metrics_ready):
+    """
+    ## Query Result and Figure Cache
+    """
+    # Label columns with only a handful of distinct values per result
+    CATEGORY_COLUMNS = pd.Index(['workstream', 'art', 'issuetype'])
+    
+    # Results are keyed by (query name, filter values); this cell re-runs after every
+    # refresh of the PI tables, which starts a fresh cache. Arrow tables are cached
+    # since they are immutable and convert to pandas without per-value Python objects
+    @functools.lru_cache(maxsize=64)
+    def cached_query(query_name, params):
+        return conn.execute(QUERIES[query_name], list(params)).to_arrow_table()
+    
+    def shrink_frame(df):
+        """Downcast numeric columns and store low-cardinality labels as categories"""
+        # Rates are rounded percentages shown as chart text, so they stay float64
+        for column in df.select_dtypes('float64').columns:
+            if not column.endswith('_rate'):
+                df[column] = df[column].astype('float32')
+        for column in df.select_dtypes('int64').columns:
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+        for column in CATEGORY_COLUMNS.intersection(df.columns):
+            df[column] = df[column].astype('category')
+        return df
+    
+    def cache_key(*params):
+        """Make filter values hashable, ignoring the order of multiselect values"""
+        return tuple(tuple(sorted(p)) if isinstance(p, list) else p for p in params)
+    
+    def run_query(query_name, *params):
+        """Run a named dashboard query, reusing the result of identical filter selections"""
+        return shrink_frame(cached_query(query_name, cache_key(*params)).to_pandas(split_blocks=True))
+    
+    # Built figures are kept per (chart, filter values) so re-renders triggered by
+    # unrelated controls reuse the figure instead of rebuilding and re-validating it
+    FIGURE_CACHE_SIZE = 64
+    figure_cache = {}
+    
+    def cached_figure(key, build):
+        """Return the figure built for key, calling build() only on first use"""
+        if key not in figure_cache:
+            if len(figure_cache) >= FIGURE_CACHE_SIZE:
+                figure_cache.pop(next(iter(figure_cache)))
+            figure_cache[key] = build()
+        return figure_cache[key]
+    
+    return (
+        CATEGORY_COLUMNS,
+        FIGURE_CACHE_SIZE,
+        cache_key,
+        cached_figure,
+        cached_query,
+        figure_cache,
+        run_query,
+        shrink_frame,
     )
-    SELECT 
-        total_features,
-        completed_features,
-        in_progress_features,
-        todo_features,
-        active_workstreams,
-        ROUND(100.0 * completed_features / NULLIF(total_features, 0), 1) as completion_rate
-    FROM summary_stats
+
+
+@app.cell
+def __(np):
     """
+    ## Chart Downsampling
+    """
+    # A line chart cannot show more points than it has horizontal pixels; longer
+    # series are reduced with Largest-Triangle-Three-Buckets, which keeps the
+    # visually significant peaks and dips of every bucket
+    MAX_CHART_POINTS = 1500
     
-    summary_df = conn.execute(summary_query).df()
+    def lttb_indices(x, y, n_out=MAX_CHART_POINTS):
+        """Return the positions of the points LTTB keeps from an ordered series"""
+        n = len(y)
+        if n <= n_out or n_out < 3:
+            return np.arange(n)
+        
+        x = np.asarray(x)
+        if np.issubdtype(x.dtype, np.datetime64):
+            x = x.astype('datetime64[ns]').view(np.int64)
+        x = x.astype(np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        
+        # First and last points are always kept; the rest split into n_out - 2 buckets
+        edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+        keep = np.empty(n_out, dtype=np.int64)
+        keep[0], keep[-1] = 0, n - 1
+        for b in range(n_out - 2):
+            lo, hi = edges[b], edges[b + 1]
+            next_lo, next_hi = (edges[b + 1], edges[b + 2]) if b + 2 < n_out - 1 else (n - 1, n)
+            next_x, next_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+            prev_x, prev_y = x[keep[b]], y[keep[b]]
+            area = np.abs((prev_x - next_x) * (y[lo:hi] - prev_y) - (prev_x - x[lo:hi]) * (next_y - prev_y))
+            keep[b + 1] = lo + np.argmax(area)
+        return keep
+    
+    return MAX_CHART_POINTS, lttb_indices
+
+
+@app.cell
+def __(
+    COMMITMENT_TYPES,
+    mo,
+    pd,
+    run_query,
+    selected_arts,
+    selected_pi,
+    selected_workstreams,
+):
+    """
+    ## Executive Summary Metrics
+    """
+    # Filter values are bound as query parameters, never spliced into SQL
+    pi_filter = selected_pi.value
+    art_filter = list(selected_arts.value)
+    workstream_filter = list(selected_workstreams.value)
+    
+    # One scan of the PI's features yields the summary, per-ART and scope-variance groups
+    pi_metrics = run_query("pi_metrics", workstream_filter, pi_filter)
+    metric_level = pi_metrics['metric_level']
+    
+    summary_df = pi_metrics.loc[metric_level == 'summary', [
+        'total_features', 'completed_features', 'in_progress_features',
+        'todo_features', 'active_workstreams', 'completion_rate'
+    ]].reset_index(drop=True)
+    
+    pi_completion_by_art = (
+        pi_metrics.loc[
+            (metric_level == 'art') & pi_metrics['art'].isin(art_filter) & (pi_metrics['total_features'] > 0),
+            ['art', 'total_features', 'completed_features', 'completion_rate']
+        ]
+        .rename(columns={'total_features': 'planned_features'})
+        .sort_values('completion_rate', ascending=False)
+    )
+    
+    scope_variance = (
+        pi_metrics.loc[
+            metric_level == 'scope',
+            ['workstream', 'commitment_type', 'feature_count', 'completed_count', 'scope_completion_rate']
+        ]
+        .rename(columns={'scope_completion_rate': 'completion_rate'})
+        .sort_values(['workstream', 'commitment_type'])
+    )
+    scope_variance['commitment_type'] = pd.Categorical.from_codes(
+        scope_variance['commitment_type'].astype('int8'), COMMITMENT_TYPES
+    )
     
     if not summary_df.empty:
         summary = summary_df.iloc[0]
@@ -202,456 +532,369 @@ def __(conn, mo, selected_arts, selected_pi, selected_workstreams):
         art_filter,
         completion_color,
         completion_rate,
+        metric_level,
+        pi_completion_by_art,
         pi_filter,
+        pi_metrics,
+        scope_variance,
         summary,
         summary_cards,
         summary_df,
-        summary_query,
         workstream_filter,
     )
 
 
-@app.cell(kind="sql", query_name="pi_completion_by_art")
-def __(art_filter, conn, pi_filter, workstream_filter):
-    # PI Feature Completion Rate by ART
-    SELECT 
-        REGEXP_EXTRACT(labels, 'ART-([^,]+)') as art,
-        COUNT(*) as planned_features,
-        COUNT(CASE WHEN status = 'Done' THEN 1 END) as completed_features,
-        ROUND(100.0 * COUNT(CASE WHEN status = 'Done' THEN 1 END) / COUNT(*), 1) as completion_rate
-    FROM issues 
-    WHERE issuetype = 'Feature' 
-      AND labels LIKE '%{pi_filter}%'
-      AND workstream IN ('{workstream_filter}')
-      AND REGEXP_EXTRACT(labels, 'ART-([^,]+)') IS NOT NULL
-    GROUP BY REGEXP_EXTRACT(labels, 'ART-([^,]+)')
-    ORDER BY completion_rate DESC
-    return
-
-
 @app.cell
-def __(mo, pi_completion_by_art, pi_filter, px):
+def __(
+    art_filter,
+    cache_key,
+    cached_figure,
+    mo,
+    pi_completion_by_art,
+    pi_filter,
+    px,
+    workstream_filter,
+):
     """
     ## PI Completion Rate by ART
     """
     if not pi_completion_by_art.empty:
-        fig_completion = px.bar(
-            pi_completion_by_art,
-            x='completion_rate',
-            y='art',
-            orientation='h',
-            title=f'{pi_filter} Feature Completion Rate by ART',
-            labels={'completion_rate': 'Completion Rate (%)', 'art': 'ART'},
-            text='completion_rate',
-            color='completion_rate',
-            color_continuous_scale='RdYlGn'
-        )
+        def _build_completion():
+            fig = px.bar(
+                pi_completion_by_art,
+                x='completion_rate',
+                y='art',
+                orientation='h',
+                title=f'{pi_filter} Feature Completion Rate by ART',
+                labels={'completion_rate': 'Completion Rate (%)', 'art': 'ART'},
+                text='completion_rate',
+                color='completion_rate',
+                color_continuous_scale='RdYlGn'
+            )
+            
+            # Add target line at 80%
+            fig.add_vline(
+                x=80, 
+                line_dash="dash", 
+                line_color="red",
+                annotation_text="Target: 80%"
+            )
+            
+            fig.update_traces(texttemplate='%{text}%', textposition='outside')
+            fig.update_layout(height=max(400, len(pi_completion_by_art) * 50))
+            return fig
         
-        # Add target line at 80%
-        fig_completion.add_vline(
-            x=80, 
-            line_dash="dash", 
-            line_color="red",
-            annotation_text="Target: 80%"
+        fig_completion = cached_figure(
+            ('completion', pi_filter, cache_key(workstream_filter), cache_key(art_filter)),
+            _build_completion
         )
-        
-        fig_completion.update_traces(texttemplate='%{text}%', textposition='outside')
-        fig_completion.update_layout(height=max(400, len(pi_completion_by_art) * 50))
-        
         mo.ui.plotly(fig_completion)
     else:
         mo.md("⚠️ No ART completion data available")
     return fig_completion,
 
 
-@app.cell(kind="sql", query_name="workstream_throughput")
-def __(conn, pi_filter, workstream_filter):
+@app.cell
+def __(pi_filter, run_query, workstream_filter):
     # Workstream Throughput Trends
-    WITH feature_completions AS (
-        SELECT 
-            f.workstream,
-            DATE_TRUNC('week', c.changed_date) as week,
-            COUNT(DISTINCT f.key) as features_completed
-        FROM issues f
-        JOIN changelog c ON f.key = c.issue_key
-        WHERE f.issuetype = 'Feature' 
-          AND c.to_status = 'Done'
-          AND f.labels LIKE '%{pi_filter}%'
-          AND c.changed_date >= CURRENT_DATE - INTERVAL '12 weeks'
-          AND f.workstream IN ('{workstream_filter}')
-        GROUP BY f.workstream, DATE_TRUNC('week', c.changed_date)
+    workstream_throughput = run_query("workstream_throughput", pi_filter, workstream_filter)
+    
+    # 4-week trailing average per workstream over the small weekly result
+    workstream_throughput['rolling_avg'] = (
+        workstream_throughput
+        .groupby('workstream', sort=False)['features_completed']
+        .rolling(4, min_periods=1)
+        .mean()
+        .reset_index(level=0, drop=True)
     )
-    SELECT 
-        workstream,
-        week,
-        features_completed,
-        AVG(features_completed) OVER (
-            PARTITION BY workstream 
-            ORDER BY week 
-            ROWS 3 PRECEDING
-        ) as rolling_avg
-    FROM feature_completions
-    ORDER BY workstream, week
-    return
+    return workstream_throughput,
 
 
 @app.cell
-def __(mo, pi_filter, px, workstream_throughput):
+def __(
+    cache_key,
+    cached_figure,
+    lttb_indices,
+    mo,
+    np,
+    pi_filter,
+    px,
+    workstream_filter,
+    workstream_throughput,
+):
     """
     ## Workstream Throughput Trends
     """
     if not workstream_throughput.empty:
-        fig_throughput = px.line(
-            workstream_throughput,
-            x='week',
-            y='features_completed',
-            color='workstream',
-            title=f'{pi_filter} Workstream Feature Throughput Trends',
-            labels={'features_completed': 'Features Completed', 'week': 'Week'}
-        )
-        
-        # Add rolling average lines
-        for workstream in workstream_throughput['workstream'].unique():
-            workstream_data = workstream_throughput[workstream_throughput['workstream'] == workstream]
-            fig_throughput.add_scatter(
-                x=workstream_data['week'],
-                y=workstream_data['rolling_avg'],
-                mode='lines',
-                name=f'{workstream} (4-week avg)',
-                line=dict(dash='dash'),
-                opacity=0.7
+        def _build_throughput():
+            # Weekly counts and rolling averages share one long frame so Plotly splits
+            # the traces by workstream (colour) and metric (dash) in a single call
+            throughput_long = workstream_throughput.melt(
+                id_vars=['workstream', 'week'],
+                value_vars=['features_completed', 'rolling_avg'],
+                var_name='metric',
+                value_name='value'
             )
+            throughput_long['metric'] = throughput_long['metric'].map({
+                'features_completed': 'Weekly',
+                'rolling_avg': '4-week avg'
+            })
+            
+            # Downsample each (workstream, metric) line independently
+            _weeks = throughput_long['week'].to_numpy()
+            _values = throughput_long['value'].to_numpy()
+            _keep = np.concatenate([
+                rows[lttb_indices(_weeks[rows], _values[rows])]
+                for rows in throughput_long.groupby(['workstream', 'metric'], observed=True).indices.values()
+            ])
+            throughput_long = throughput_long.iloc[np.sort(_keep)]
+            
+            fig = px.line(
+                throughput_long,
+                x='week',
+                y='value',
+                color='workstream',
+                line_dash='metric',
+                line_dash_map={'Weekly': 'solid', '4-week avg': 'dash'},
+                title=f'{pi_filter} Workstream Feature Throughput Trends',
+                labels={'value': 'Features Completed', 'week': 'Week', 'metric': 'Metric'}
+            )
+            fig.update_traces(opacity=0.7, selector=dict(line_dash='dash'))
+            
+            fig.update_layout(height=500)
+            return fig
         
-        fig_throughput.update_layout(height=500)
+        fig_throughput = cached_figure(
+            ('throughput', pi_filter, cache_key(workstream_filter)),
+            _build_throughput
+        )
         mo.ui.plotly(fig_throughput)
     else:
         mo.md("⚠️ No throughput data available")
-    return fig_throughput, workstream, workstream_data
+    return fig_throughput,
 
 
-@app.cell(kind="sql", query_name="lead_time_distribution")
-def __(conn, pi_filter, workstream_filter):
+@app.cell
+def __(pi_filter, run_query, workstream_filter):
     # Feature Lead Time Distribution
-    SELECT 
-        workstream,
-        key,
-        (resolved_date - created_date) as lead_time_days,
-        PERCENTILE_CONT(0.50) OVER (PARTITION BY workstream) as p50_lead_time,
-        PERCENTILE_CONT(0.85) OVER (PARTITION BY workstream) as p85_lead_time
-    FROM issues 
-    WHERE issuetype = 'Feature' 
-      AND status = 'Done'
-      AND labels LIKE '%{pi_filter}%'
-      AND resolved_date IS NOT NULL
-      AND workstream IN ('{workstream_filter}')
-    ORDER BY workstream, lead_time_days
-    return
+    lead_time_distribution = run_query("lead_time_distribution", pi_filter, workstream_filter)
+    return lead_time_distribution,
 
 
 @app.cell
-def __(lead_time_distribution, mo, pi_filter, px):
+def __(cache_key, cached_figure, lead_time_distribution, mo, pi_filter, px, workstream_filter):
     """
     ## Feature Lead Time Distribution
     """
     if not lead_time_distribution.empty:
-        fig_lead_time = px.box(
-            lead_time_distribution,
-            x='workstream',
-            y='lead_time_days',
-            title=f'{pi_filter} Feature Lead Time Distribution by Workstream',
-            labels={'lead_time_days': 'Lead Time (Days)', 'workstream': 'Workstream'}
-        )
+        def _build_lead_time():
+            fig = px.box(
+                lead_time_distribution,
+                x='workstream',
+                y='lead_time_days',
+                title=f'{pi_filter} Feature Lead Time Distribution by Workstream',
+                labels={'lead_time_days': 'Lead Time (Days)', 'workstream': 'Workstream'}
+            )
+            
+            fig.update_layout(
+                xaxis_tickangle=-45,
+                height=500
+            )
+            return fig
         
-        fig_lead_time.update_layout(
-            xaxis_tickangle=-45,
-            height=500
+        fig_lead_time = cached_figure(
+            ('lead_time', pi_filter, cache_key(workstream_filter)),
+            _build_lead_time
         )
-        
         mo.ui.plotly(fig_lead_time)
     else:
         mo.md("⚠️ No lead time data available")
     return fig_lead_time,
 
 
-@app.cell(kind="sql", query_name="pi_burnup_data")
-def __(conn, pi_filter):
+@app.cell
+def __(pi_filter, run_query):
     # PI Burnup Progress
-    WITH pi_scope AS (
-        SELECT 
-            REGEXP_EXTRACT(labels, 'PI-([^,]+)') as pi,
-            COUNT(*) as total_planned
-        FROM issues 
-        WHERE issuetype = 'Feature' AND labels LIKE '%{pi_filter}%'
-        GROUP BY REGEXP_EXTRACT(labels, 'PI-([^,]+)')
-    ),
-    daily_completions AS (
-        SELECT 
-            REGEXP_EXTRACT(f.labels, 'PI-([^,]+)') as pi,
-            DATE_TRUNC('day', c.changed_date) as completion_date,
-            COUNT(*) as features_completed_today
-        FROM issues f
-        JOIN changelog c ON f.key = c.issue_key
-        WHERE f.issuetype = 'Feature' 
-          AND c.to_status = 'Done'
-          AND f.labels LIKE '%{pi_filter}%'
-        GROUP BY REGEXP_EXTRACT(f.labels, 'PI-([^,]+)'), DATE_TRUNC('day', c.changed_date)
-    )
-    SELECT 
-        dc.pi,
-        dc.completion_date,
-        SUM(dc.features_completed_today) OVER (
-            PARTITION BY dc.pi 
-            ORDER BY dc.completion_date
-        ) as cumulative_completed,
-        ps.total_planned
-    FROM daily_completions dc
-    JOIN pi_scope ps ON dc.pi = ps.pi
-    ORDER BY dc.pi, dc.completion_date
-    return
+    pi_burnup_data = run_query("pi_burnup_data", pi_filter, pi_filter)
+    return pi_burnup_data,
 
 
 @app.cell
-def __(go, mo, pd, pi_burnup_data, pi_filter):
+def __(cached_figure, go, lttb_indices, mo, np, pi_burnup_data, pi_filter):
     """
     ## PI Burnup Progress
     """
     if not pi_burnup_data.empty:
-        fig_burnup = go.Figure()
-        
-        # Actual progress line
-        fig_burnup.add_trace(
-            go.Scatter(
-                x=pi_burnup_data['completion_date'],
-                y=pi_burnup_data['cumulative_completed'],
-                mode='lines+markers',
-                name='Actual Progress',
-                line=dict(color='blue', width=3)
+        def _build_burnup():
+            fig = go.Figure()
+            
+            # Actual progress line, downsampled when the PI spans more days than the chart can show
+            burnup_points = pi_burnup_data.iloc[
+                lttb_indices(pi_burnup_data['completion_date'], pi_burnup_data['cumulative_completed'])
+            ]
+            fig.add_trace(
+                go.Scatter(
+                    x=burnup_points['completion_date'],
+                    y=burnup_points['cumulative_completed'],
+                    mode='lines+markers',
+                    name='Actual Progress',
+                    line=dict(color='blue', width=3)
+                )
             )
-        )
-        
-        # Ideal burnup line
-        start_date = pi_burnup_data['completion_date'].min()
-        end_date = pi_burnup_data['completion_date'].max()
-        total_planned = pi_burnup_data['total_planned'].iloc[0]
-        
-        # Create ideal line
-        date_range = pd.date_range(start=start_date, end=end_date, freq='D')
-        ideal_progress = [i * total_planned / (len(date_range) - 1) for i in range(len(date_range))]
-        
-        fig_burnup.add_trace(
-            go.Scatter(
-                x=date_range,
-                y=ideal_progress,
-                mode='lines',
-                name='Ideal Progress',
-                line=dict(color='green', dash='dash', width=2)
+            
+            # Ideal burnup line
+            start_date = pi_burnup_data['completion_date'].min()
+            end_date = pi_burnup_data['completion_date'].max()
+            total_planned = pi_burnup_data['total_planned'].iloc[0]
+            
+            # The ideal line is linear, so its two endpoints are enough
+            ideal_dates = [start_date, end_date]
+            ideal_progress = np.linspace(0.0, total_planned, num=len(ideal_dates))
+            
+            fig.add_trace(
+                go.Scatter(
+                    x=ideal_dates,
+                    y=ideal_progress,
+                    mode='lines',
+                    name='Ideal Progress',
+                    line=dict(color='green', dash='dash', width=2)
+                )
             )
-        )
-        
-        # Total planned line
-        fig_burnup.add_hline(
-            y=total_planned,
-            line_dash="dot",
-            line_color="red",
-            annotation_text=f"Total Planned: {total_planned}"
-        )
-        
-        fig_burnup.update_layout(
-            title=f'{pi_filter} Feature Burnup Progress',
-            xaxis_title='Date',
-            yaxis_title='Cumulative Features Completed',
-            hovermode='x unified',
-            height=500
-        )
+            
+            # Total planned line
+            fig.add_hline(
+                y=total_planned,
+                line_dash="dot",
+                line_color="red",
+                annotation_text=f"Total Planned: {total_planned}"
+            )
+            
+            fig.update_layout(
+                title=f'{pi_filter} Feature Burnup Progress',
+                xaxis_title='Date',
+                yaxis_title='Cumulative Features Completed',
+                hovermode='x unified',
+                height=500
+            )
+            return fig
         
+        fig_burnup = cached_figure(('burnup', pi_filter), _build_burnup)
         mo.ui.plotly(fig_burnup)
     else:
         mo.md("⚠️ No burnup data available")
-    return (
-        date_range,
-        end_date,
-        fig_burnup,
-        i,
-        ideal_progress,
-        start_date,
-        total_planned,
-    )
+    return fig_burnup,
 
 
-@app.cell(kind="sql", query_name="cross_art_dependencies")
-def __(conn, pi_filter):
+@app.cell
+def __(pi_filter, run_query):
     # Cross-ART Dependencies
-    WITH art_dependencies AS (
-        SELECT 
-            REGEXP_EXTRACT(i1.labels, 'ART-([^,]+)') as source_art,
-            REGEXP_EXTRACT(i2.labels, 'ART-([^,]+)') as target_art,
-            i1.key as source_key,
-            i2.key as target_key,
-            i2.status as target_status
-        FROM issues i1
-        JOIN issue_links il ON i1.key = il.source_key
-        JOIN issues i2 ON il.target_key = i2.key
-        WHERE i1.issuetype = 'Feature' 
-          AND i2.issuetype = 'Feature'
-          AND i1.labels LIKE '%{pi_filter}%'
-          AND i2.labels LIKE '%{pi_filter}%'
-          AND REGEXP_EXTRACT(i1.labels, 'ART-([^,]+)') IS NOT NULL
-          AND REGEXP_EXTRACT(i2.labels, 'ART-([^,]+)') IS NOT NULL
-    )
-    SELECT 
-        source_art,
-        target_art,
-        COUNT(*) as dependency_count,
-        COUNT(CASE WHEN target_status = 'Done' THEN 1 END) as resolved_dependencies,
-        ROUND(100.0 * COUNT(CASE WHEN target_status = 'Done' THEN 1 END) / COUNT(*), 1) as resolution_rate
-    FROM art_dependencies
-    WHERE source_art != target_art
-    GROUP BY source_art, target_art
-    ORDER BY dependency_count DESC
-    return
+    cross_art_dependencies = run_query("cross_art_dependencies", pi_filter, pi_filter)
+    return cross_art_dependencies,
 
 
 @app.cell
-def __(cross_art_dependencies, mo, pd, pi_filter, px):
+def __(cached_figure, cross_art_dependencies, mo, np, pd, pi_filter, px):
     """
     ## Cross-ART Dependencies
     """
     if not cross_art_dependencies.empty:
-        # Create dependency matrix for heatmap
-        arts = list(set(cross_art_dependencies['source_art'].tolist() + cross_art_dependencies['target_art'].tolist()))
-        matrix = pd.DataFrame(0, index=arts, columns=arts)
-        
-        for _, row in cross_art_dependencies.iterrows():
-            matrix.loc[row['source_art'], row['target_art']] = row['dependency_count']
-        
-        fig_dependencies = px.imshow(
-            matrix,
-            title=f'{pi_filter} Cross-ART Dependency Matrix',
-            labels={'x': 'Target ART', 'y': 'Source ART', 'color': 'Dependencies'},
-            aspect='auto',
-            color_continuous_scale='Blues'
-        )
-        
-        # Add text annotations
-        for i, source in enumerate(arts):
-            for j, target in enumerate(arts):
-                if matrix.iloc[i, j] > 0:
-                    fig_dependencies.add_annotation(
-                        x=j, y=i,
-                        text=str(int(matrix.iloc[i, j])),
-                        showarrow=False,
-                        font=dict(color='white' if matrix.iloc[i, j] > matrix.values.max()/2 else 'black')
-                    )
+        def _build_dependencies():
+            # Create dependency matrix for heatmap
+            arts = pd.Index(sorted(set(cross_art_dependencies['source_art']) | set(cross_art_dependencies['target_art'])))
+            matrix = cross_art_dependencies.pivot_table(
+                index='source_art',
+                columns='target_art',
+                values='dependency_count',
+                aggfunc='sum',
+                fill_value=0
+            ).reindex(index=arts, columns=arts, fill_value=0)
+            
+            fig = px.imshow(
+                matrix,
+                title=f'{pi_filter} Cross-ART Dependency Matrix',
+                labels={'x': 'Target ART', 'y': 'Source ART', 'color': 'Dependencies'},
+                aspect='auto',
+                color_continuous_scale='Blues'
+            )
+            
+            # Add text annotations for the non-empty cells in one layout update
+            counts = matrix.to_numpy()
+            ys, xs = np.nonzero(counts)
+            values = counts[ys, xs]
+            font_colors = np.where(values > counts.max() / 2, 'white', 'black')
+            fig.update_layout(annotations=[
+                dict(x=x, y=y, text=str(int(value)), showarrow=False, font=dict(color=color))
+                for x, y, value, color in zip(xs.tolist(), ys.tolist(), values.tolist(), font_colors.tolist())
+            ])
+            
+            fig.update_layout(height=500)
+            return fig
         
-        fig_dependencies.update_layout(height=500)
+        fig_dependencies = cached_figure(('dependencies', pi_filter), _build_dependencies)
         mo.ui.plotly(fig_dependencies)
     else:
         mo.md("⚠️ No cross-ART dependency data available")
-    return arts, fig_dependencies, j, matrix, row
-
-
-@app.cell(kind="sql", query_name="scope_variance")
-def __(conn, pi_filter):
-    # Scope Variance Analysis
-    WITH pi_features AS (
-        SELECT 
-            key,
-            summary,
-            workstream,
-            status,
-            created_date,
-            CASE 
-                WHEN created_date <= '2024-07-01' THEN 'Committed'
-                ELSE 'Added'
-            END as commitment_type
-        FROM issues 
-        WHERE issuetype = 'Feature' 
-          AND labels LIKE '%{pi_filter}%'
-    )
-    SELECT 
-        workstream,
-        commitment_type,
-        COUNT(*) as feature_count,
-        COUNT(CASE WHEN status = 'Done' THEN 1 END) as completed_count,
-        ROUND(100.0 * COUNT(CASE WHEN status = 'Done' THEN 1 END) / COUNT(*), 1) as completion_rate
-    FROM pi_features
-    GROUP BY workstream, commitment_type
-    ORDER BY workstream, commitment_type
-    return
+    return fig_dependencies,
 
 
 @app.cell
-def __(mo, pi_filter, px, scope_variance):
+def __(cached_figure, mo, pi_filter, px, scope_variance):
     """
     ## Scope Variance Analysis
     """
     if not scope_variance.empty:
-        fig_scope = px.bar(
-            scope_variance,
-            x='workstream',
-            y='feature_count',
-            color='commitment_type',
-            title=f'{pi_filter} Committed vs Added Features by Workstream',
-            labels={'feature_count': 'Feature Count', 'workstream': 'Workstream'},
-            barmode='group'
-        )
-        
-        fig_scope.update_layout(
-            xaxis_tickangle=-45,
-            height=500
-        )
+        def _build_scope():
+            fig = px.bar(
+                scope_variance,
+                x='workstream',
+                y='feature_count',
+                color='commitment_type',
+                title=f'{pi_filter} Committed vs Added Features by Workstream',
+                labels={'feature_count': 'Feature Count', 'workstream': 'Workstream'},
+                barmode='group'
+            )
+            
+            fig.update_layout(
+                xaxis_tickangle=-45,
+                height=500
+            )
+            return fig
         
+        fig_scope = cached_figure(('scope', pi_filter), _build_scope)
         mo.ui.plotly(fig_scope)
     else:
         mo.md("⚠️ No scope variance data available")
     return fig_scope,
 
 
-@app.cell(kind="sql", query_name="unplanned_work")
-def __(conn, pi_filter):
+@app.cell
+def __(WORK_CLASSIFICATIONS, pd, pi_filter, run_query):
     # Unplanned Work Analysis
-    WITH work_classification AS (
-        SELECT 
-            workstream,
-            issuetype,
-            CASE 
-                WHEN labels LIKE '%{pi_filter}%' THEN 'PI-Committed'
-                WHEN resolved_date BETWEEN '2024-07-01' AND '2024-09-30' THEN 'Unplanned-Delivered'
-                ELSE 'Outside-Scope'
-            END as work_classification,
-            story_points
-        FROM issues 
-        WHERE (resolved_date BETWEEN '2024-07-01' AND '2024-09-30'
-               OR labels LIKE '%{pi_filter}%')
-          AND issuetype IN ('Feature', 'Story', 'Bug', 'Task')
-          AND workstream IS NOT NULL
+    unplanned_work = run_query("unplanned_work", pi_filter)
+    unplanned_work['work_classification'] = pd.Categorical.from_codes(
+        unplanned_work['work_classification'], WORK_CLASSIFICATIONS
     )
-    SELECT 
-        workstream,
-        work_classification,
-        issuetype,
-        COUNT(*) as issue_count,
-        SUM(COALESCE(story_points, 0)) as total_story_points
-    FROM work_classification
-    GROUP BY workstream, work_classification, issuetype
-    ORDER BY workstream, work_classification, issue_count DESC
-    return
+    return unplanned_work,
 
 
 @app.cell
-def __(mo, pi_filter, px, unplanned_work):
+def __(cached_figure, mo, pi_filter, px, unplanned_work):
     """
     ## Unplanned Work Analysis
     """
     if not unplanned_work.empty:
-        fig_unplanned = px.treemap(
-            unplanned_work,
-            path=['workstream', 'work_classification', 'issuetype'],
-            values='total_story_points',
-            title=f'{pi_filter} Work Classification by Story Points'
-        )
+        def _build_unplanned():
+            fig = px.treemap(
+                unplanned_work,
+                path=['workstream', 'work_classification', 'issuetype'],
+                values='total_story_points',
+                title=f'{pi_filter} Work Classification by Story Points'
+            )
+            
+            fig.update_layout(height=600)
+            return fig
         
-        fig_unplanned.update_layout(height=600)
+        fig_unplanned = cached_figure(('unplanned', pi_filter), _build_unplanned)
         mo.ui.plotly(fig_unplanned)
     else:
         mo.md("⚠️ No unplanned work data available")
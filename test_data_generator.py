@@ -6,15 +6,15 @@ Creates realistic mock Jira data for testing dashboard functionality
 import duckdb
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+import pyarrow as pa
+from datetime import datetime
 import uuid
+from functools import reduce
 
 class JiraTestDataGenerator:
     def __init__(self, seed=42):
         """Initialize test data generator with reproducible seed"""
-        random.seed(seed)
-        np.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
         
         # Configuration
         self.pis = ['PI-2024-Q2', 'PI-2024-Q3', 'PI-2024-Q4']
@@ -26,6 +26,13 @@ class JiraTestDataGenerator:
         self.statuses = ['To Do', 'In Progress', 'In Review', 'Done', 'Blocked']
         self.issue_types = ['Feature', 'Story', 'Bug', 'Task', 'Sub-task']
         self.priorities = ['Critical', 'High', 'Medium', 'Low']
+        self.key_prefixes = {
+            'Feature': 'FEAT',
+            'Story': 'STORY',
+            'Bug': 'BUG',
+            'Task': 'TASK',
+            'Sub-task': 'SUB'
+        }
         
         # Date ranges for different PIs
         self.pi_dates = {
@@ -33,391 +40,371 @@ class JiraTestDataGenerator:
             'PI-2024-Q3': (datetime(2024, 7, 1), datetime(2024, 9, 30)),
             'PI-2024-Q4': (datetime(2024, 10, 1), datetime(2024, 12, 31))
         }
+        
+        # Lookup arrays built once so sampling is plain integer indexing
+        self.pi_names = np.array(self.pis)
+        self.art_names = np.array(self.arts)
+        self.art_labels = np.char.add('ART-', self.art_names)
+        self.pi_bounds = np.array([self.pi_dates[p] for p in self.pis], dtype='datetime64[D]').astype(np.int64)
+        
+        # Summary vocabulary; domain-specific terms have one row per ART
+        self.domains = np.array([
+            ['authentication', 'infrastructure', 'monitoring', 'deployment'],
+            ['checkout', 'payment', 'catalog', 'inventory'],
+            ['reporting', 'metrics', 'dashboards', 'data pipeline'],
+            ['iOS app', 'Android app', 'push notifications', 'offline sync']
+        ])
+        self.summary_terms = {
+            'feature': np.array(['user management', 'data export', 'real-time sync', 'performance optimization']),
+            'component': np.array(['API', 'database', 'UI component', 'service', 'module']),
+            'capability': np.array(['search', 'filtering', 'sorting', 'pagination']),
+            'functionality': np.array(['caching', 'validation', 'security', 'monitoring']),
+            'action': np.array(['view reports', 'export data', 'filter results', 'save preferences']),
+            'benefit': np.array(['better visibility', 'improved efficiency', 'easier access', 'enhanced security']),
+            'field': np.array(['email', 'password', 'date', 'amount']),
+            'module': np.array(['authentication', 'validation', 'reporting', 'integration']),
+            'ui': np.array(['form', 'table', 'chart', 'modal'])
+        }
+        self.label_components = np.array(['backend', 'frontend', 'database', 'api', 'integration'])
+        
+        # Cumulative sampling weights, one row per generated issue type
+        self.generated_types = ['Feature', 'Story', 'Bug', 'Task']
+        
+        # Status rows per issue type and PI; features have higher completion rates in earlier PIs
+        self.status_cum = self._cumulative([
+            [[5, 10, 10, 70, 5], [10, 20, 15, 50, 5], [30, 30, 20, 15, 5]],
+            [[15, 25, 15, 40, 5]] * len(self.pis),
+            [[20, 30, 10, 35, 5]] * len(self.pis),
+            [[10, 20, 10, 55, 5]] * len(self.pis)
+        ]).reshape(-1, len(self.statuses))
+        
+        # Bugs skew towards higher priorities
+        self.priority_cum = self._cumulative([
+            [1, 1, 1, 1],
+            [1, 1, 1, 1],
+            [10, 30, 40, 20],
+            [1, 1, 1, 1]
+        ])
+        
+        # Story point scales per issue type; features are left unestimated
+        self.story_point_values = np.array([1, 2, 3, 5, 8, 13], dtype=np.int8)
+        self.story_point_cum = self._cumulative([
+            [1, 0, 0, 0, 0, 0],
+            [20, 30, 25, 15, 8, 2],
+            [40, 30, 20, 10, 0, 0],
+            [50, 30, 20, 0, 0, 0]
+        ])
     
     def generate_issue_key(self, issue_type, index):
         """Generate realistic Jira issue keys"""
-        prefixes = {
-            'Feature': 'FEAT',
-            'Story': 'STORY',
-            'Bug': 'BUG',
-            'Task': 'TASK',
-            'Sub-task': 'SUB'
-        }
-        return f"{prefixes.get(issue_type, 'ISSUE')}-{index:04d}"
+        return f"{self.key_prefixes.get(issue_type, 'ISSUE')}-{index:04d}"
     
-    def generate_realistic_summary(self, issue_type, pi, art):
-        """Generate realistic issue summaries"""
-        feature_templates = [
-            "Implement {feature} for {domain}",
-            "Add {capability} to {system}",
-            "Enhance {component} with {functionality}",
-            "Create {service} integration",
-            "Develop {feature} dashboard"
-        ]
-        
-        story_templates = [
-            "As a user, I want to {action} so that {benefit}",
-            "Implement {component} API endpoint",
-            "Add validation for {field}",
-            "Create unit tests for {module}",
-            "Update documentation for {feature}"
-        ]
-        
-        bug_templates = [
-            "Fix {component} memory leak",
-            "Resolve {system} timeout issues",
-            "Correct {feature} validation logic",
-            "Address {service} error handling",
-            "Fix {ui} display issues"
-        ]
-        
-        # Domain-specific terms
-        domains = {
-            'Platform': ['authentication', 'infrastructure', 'monitoring', 'deployment'],
-            'Commerce': ['checkout', 'payment', 'catalog', 'inventory'],
-            'Analytics': ['reporting', 'metrics', 'dashboards', 'data pipeline'],
-            'Mobile': ['iOS app', 'Android app', 'push notifications', 'offline sync']
-        }
-        
-        features = ['user management', 'data export', 'real-time sync', 'performance optimization']
-        components = ['API', 'database', 'UI component', 'service', 'module']
+    def generate_issue_keys(self, issue_types, start_index=1):
+        """Generate consecutive issue keys for an array of issue types in one vectorised call"""
+        types, type_idx = np.unique(issue_types, return_inverse=True)
+        prefixes = np.array([f"{self.key_prefixes.get(t, 'ISSUE')}-" for t in types])
+        numbers = np.arange(start_index, start_index + len(type_idx)).astype(str)
+        return np.char.add(prefixes[type_idx], np.char.zfill(numbers, 4))
+    
+    def _concat(self, *parts):
+        """Element-wise string concatenation of arrays and scalars"""
+        return reduce(np.char.add, parts)
+    
+    def _pick(self, pool, size):
+        """Gather size random entries from a string pool by integer index"""
+        return pool[self.rng.integers(len(pool), size=size)]
+    
+    def generate_realistic_summaries(self, issue_type, pi_idx, art_idx):
+        """Generate realistic issue summaries for a batch of issues"""
+        n = len(art_idx)
+        art = self.art_names[art_idx]
+        terms = self.summary_terms
+        domain = self.domains[art_idx, self.rng.integers(self.domains.shape[1], size=n)]
+        system = np.char.add(art, ' system')
+        service = np.char.add(np.char.lower(art), ' service')
         
         if issue_type == 'Feature':
-            template = random.choice(feature_templates)
-            return template.format(
-                feature=random.choice(features),
-                domain=random.choice(domains.get(art, domains['Platform'])),
-                capability=random.choice(['search', 'filtering', 'sorting', 'pagination']),
-                system=f"{art} system",
-                component=random.choice(components),
-                functionality=random.choice(['caching', 'validation', 'security', 'monitoring']),
-                service=f"{art.lower()} service"
-            )
+            templates = [
+                self._concat('Implement ', self._pick(terms['feature'], n), ' for ', domain),
+                self._concat('Add ', self._pick(terms['capability'], n), ' to ', system),
+                self._concat('Enhance ', self._pick(terms['component'], n), ' with ', self._pick(terms['functionality'], n)),
+                self._concat('Create ', service, ' integration'),
+                self._concat('Develop ', self._pick(terms['feature'], n), ' dashboard')
+            ]
         elif issue_type == 'Story':
-            template = random.choice(story_templates)
-            return template.format(
-                action=random.choice(['view reports', 'export data', 'filter results', 'save preferences']),
-                benefit=random.choice(['better visibility', 'improved efficiency', 'easier access', 'enhanced security']),
-                component=random.choice(components),
-                field=random.choice(['email', 'password', 'date', 'amount']),
-                module=random.choice(['authentication', 'validation', 'reporting', 'integration']),
-                feature=random.choice(domains.get(art, domains['Platform']))
-            )
+            templates = [
+                self._concat('As a user, I want to ', self._pick(terms['action'], n), ' so that ', self._pick(terms['benefit'], n)),
+                self._concat('Implement ', self._pick(terms['component'], n), ' API endpoint'),
+                self._concat('Add validation for ', self._pick(terms['field'], n)),
+                self._concat('Create unit tests for ', self._pick(terms['module'], n)),
+                self._concat('Update documentation for ', domain)
+            ]
         elif issue_type == 'Bug':
-            template = random.choice(bug_templates)
-            return template.format(
-                component=random.choice(components),
-                system=f"{art} system",
-                feature=random.choice(domains.get(art, domains['Platform'])),
-                service=f"{art.lower()} service",
-                ui=random.choice(['form', 'table', 'chart', 'modal'])
-            )
+            templates = [
+                self._concat('Fix ', self._pick(terms['component'], n), ' memory leak'),
+                self._concat('Resolve ', system, ' timeout issues'),
+                self._concat('Correct ', domain, ' validation logic'),
+                self._concat('Address ', service, ' error handling'),
+                self._concat('Fix ', self._pick(terms['ui'], n), ' display issues')
+            ]
         else:
-            return f"{issue_type} for {art} {pi}"
+            return self._concat(f"{issue_type} for ", art, ' ', self.pi_names[pi_idx])
+        
+        template_idx = self.rng.integers(len(templates), size=n)
+        return np.stack(templates)[template_idx, np.arange(n)]
     
-    def generate_labels(self, pi, art, issue_type):
-        """Generate realistic label combinations"""
-        labels = [pi, f"ART-{art}"]
+    def generate_label_columns(self, pi_idx, art_idx, is_feature):
+        """Sample structured label columns and serialise them to the comma-joined labels"""
+        n = len(pi_idx)
         
         # Add objective labels for features
-        if issue_type == 'Feature':
-            obj_num = random.randint(1, 5)
-            labels.append(f"OBJ-{obj_num}")
-        
-        # Add component labels
-        components = ['backend', 'frontend', 'database', 'api', 'integration']
-        if random.random() < 0.6:  # 60% chance
-            labels.append(random.choice(components))
-        
-        # Add priority labels occasionally
-        if random.random() < 0.3:  # 30% chance
-            labels.append('urgent')
-        
-        return ', '.join(labels)
+        obj_num = np.where(is_feature, self.rng.integers(1, 6, size=n), 0)
+        obj_label = np.where(obj_num > 0, np.char.add(', OBJ-', obj_num.astype(str)), '')
+        
+        # Add component labels (60% chance) and priority labels occasionally (30% chance)
+        component = self._pick(self.label_components, n)
+        has_component = self.rng.random(n) < 0.6
+        urgent = self.rng.random(n) < 0.3
+        
+        labels = self._concat(
+            self.pi_names[pi_idx], ', ', self.art_labels[art_idx], obj_label,
+            np.where(has_component, np.char.add(', ', component), ''),
+            np.where(urgent, ', urgent', '')
+        )
+        
+        return {
+            'labels': labels,
+            'obj_num': obj_num,
+            'component': np.where(has_component, component, None),
+            'urgent': urgent
+        }
     
-    def generate_story_points(self, issue_type):
-        """Generate realistic story point estimates"""
-        if issue_type == 'Feature':
-            return None  # Features typically don't have story points
-        elif issue_type == 'Story':
-            return random.choices([1, 2, 3, 5, 8, 13], weights=[20, 30, 25, 15, 8, 2])[0]
-        elif issue_type == 'Bug':
-            return random.choices([1, 2, 3, 5], weights=[40, 30, 20, 10])[0]
-        elif issue_type in ['Task', 'Sub-task']:
-            return random.choices([1, 2, 3], weights=[50, 30, 20])[0]
-        return None
+    def _days_to_datetime(self, days):
+        """Convert int64 days since the epoch to a datetime64 array"""
+        return days.astype('datetime64[D]').astype('datetime64[s]')
+    
+    def generate_dates(self, pi_idx, status_idx):
+        """Generate realistic created and resolved dates for a batch of issues"""
+        n = len(pi_idx)
+        pi_start, pi_end = self.pi_bounds[pi_idx, 0], self.pi_bounds[pi_idx, 1]
+        
+        is_done = status_idx == self.statuses.index('Done')
+        
+        # Created date - 70% created in PI timeframe, 30% created before PI (pre-planned);
+        # Done issues are created by the PI's second-to-last day so they can resolve inside it
+        in_pi = self.rng.random(n) < 0.7
+        created = np.where(
+            in_pi,
+            pi_start + self.rng.integers(0, pi_end - is_done - pi_start + 1),
+            pi_start - self.rng.integers(1, 61, size=n)
+        )
+        
+        # Done issues are resolved 1-30 days after creation, within PI timeframe; the floor
+        # only applies to open issues created on the PI's last day, whose date is discarded
+        max_days = np.maximum(np.minimum(30, pi_end - created), 1)
+        resolved = created + self.rng.integers(1, max_days + 1)
+        
+        return (
+            self._days_to_datetime(created),
+            np.where(is_done, self._days_to_datetime(resolved), np.datetime64('NaT', 's'))
+        )
     
-    def generate_dates(self, pi, status):
-        """Generate realistic created and resolved dates"""
-        pi_start, pi_end = self.pi_dates[pi]
-        
-        # Created date - features mostly created before PI, others during
-        if random.random() < 0.7:  # 70% created in PI timeframe
-            created_date = pi_start + timedelta(
-                days=random.randint(0, (pi_end - pi_start).days)
-            )
-        else:  # 30% created before PI (pre-planned)
-            created_date = pi_start - timedelta(days=random.randint(1, 60))
-        
-        # Resolved date based on status
-        resolved_date = None
-        if status == 'Done':
-            # Resolved sometime after creation, within PI timeframe
-            min_days = 1
-            max_days = min(30, (pi_end - created_date).days)
-            if max_days > min_days:
-                resolved_date = created_date + timedelta(
-                    days=random.randint(min_days, max_days)
-                )
-        
-        return created_date, resolved_date
+    def _sample(self, population, size):
+        """Draw size values uniformly from population (or codes below an int) in one call"""
+        return self.rng.choice(population, size=size)
+    
+    def _cumulative(self, weights):
+        """Normalise relative weights into cumulative probabilities along the last axis"""
+        cum_weights = np.cumsum(np.asarray(weights, dtype=float), axis=-1)
+        return cum_weights / cum_weights[..., -1:]
+    
+    def _draw(self, cum_weights, rows):
+        """Draw one index per issue from its row of a cumulative weight table with a single searchsorted"""
+        num_rows, k = cum_weights.shape
+        # Offsetting row r by r lays every row out in one sorted array
+        offset_weights = (cum_weights + np.arange(num_rows)[:, None]).ravel()
+        u = self.rng.random(len(rows))
+        idx = np.searchsorted(offset_weights, u + rows, side='right') - rows * k
+        return np.minimum(idx, k - 1)
     
     def generate_issues(self, num_features=50, num_stories=200, num_bugs=80, num_tasks=100):
-        """Generate main issues table"""
-        issues = []
-        issue_index = 1
-        
-        # Generate Features
-        for i in range(num_features):
-            pi = random.choice(self.pis)
-            art = random.choice(self.arts)
-            workstream = random.choice(self.workstreams)
-            
-            # Features have higher completion rates in earlier PIs
-            if pi == 'PI-2024-Q2':
-                status = random.choices(self.statuses, weights=[5, 10, 10, 70, 5])[0]
-            elif pi == 'PI-2024-Q3':
-                status = random.choices(self.statuses, weights=[10, 20, 15, 50, 5])[0]
-            else:  # PI-2024-Q4
-                status = random.choices(self.statuses, weights=[30, 30, 20, 15, 5])[0]
-            
-            created_date, resolved_date = self.generate_dates(pi, status)
-            
-            issue = {
-                'key': self.generate_issue_key('Feature', issue_index),
-                'issuetype': 'Feature',
-                'summary': self.generate_realistic_summary('Feature', pi, art),
-                'status': status,
-                'priority': random.choice(self.priorities),
-                'workstream': workstream,
-                'labels': self.generate_labels(pi, art, 'Feature'),
-                'story_points': self.generate_story_points('Feature'),
-                'created_date': created_date,
-                'resolved_date': resolved_date,
-                'parent_key': None
-            }
-            issues.append(issue)
-            issue_index += 1
-        
-        # Generate Stories (some linked to features)
-        for i in range(num_stories):
-            pi = random.choice(self.pis)
-            art = random.choice(self.arts)
-            workstream = random.choice(self.workstreams)
-            status = random.choices(self.statuses, weights=[15, 25, 15, 40, 5])[0]
-            
-            # Some stories belong to features
-            parent_key = None
-            if random.random() < 0.6:  # 60% linked to features
-                feature_issues = [iss for iss in issues if iss['issuetype'] == 'Feature' and pi in iss['labels']]
-                if feature_issues:
-                    parent_key = random.choice(feature_issues)['key']
-            
-            created_date, resolved_date = self.generate_dates(pi, status)
-            
-            issue = {
-                'key': self.generate_issue_key('Story', issue_index),
-                'issuetype': 'Story',
-                'summary': self.generate_realistic_summary('Story', pi, art),
-                'status': status,
-                'priority': random.choice(self.priorities),
-                'workstream': workstream,
-                'labels': self.generate_labels(pi, art, 'Story'),
-                'story_points': self.generate_story_points('Story'),
-                'created_date': created_date,
-                'resolved_date': resolved_date,
-                'parent_key': parent_key
-            }
-            issues.append(issue)
-            issue_index += 1
-        
-        # Generate Bugs
-        for i in range(num_bugs):
-            pi = random.choice(self.pis)
-            art = random.choice(self.arts)
-            workstream = random.choice(self.workstreams)
-            
-            # Bugs have different status distribution
-            status = random.choices(self.statuses, weights=[20, 30, 10, 35, 5])[0]
-            
-            created_date, resolved_date = self.generate_dates(pi, status)
-            
-            issue = {
-                'key': self.generate_issue_key('Bug', issue_index),
-                'issuetype': 'Bug',
-                'summary': self.generate_realistic_summary('Bug', pi, art),
-                'status': status,
-                'priority': random.choices(self.priorities, weights=[10, 30, 40, 20])[0],
-                'workstream': workstream,
-                'labels': self.generate_labels(pi, art, 'Bug'),
-                'story_points': self.generate_story_points('Bug'),
-                'created_date': created_date,
-                'resolved_date': resolved_date,
-                'parent_key': None
-            }
-            issues.append(issue)
-            issue_index += 1
-        
-        # Generate Tasks
-        for i in range(num_tasks):
-            pi = random.choice(self.pis)
-            art = random.choice(self.arts)
-            workstream = random.choice(self.workstreams)
-            status = random.choices(self.statuses, weights=[10, 20, 10, 55, 5])[0]
-            
-            created_date, resolved_date = self.generate_dates(pi, status)
-            
-            issue = {
-                'key': self.generate_issue_key('Task', issue_index),
-                'issuetype': 'Task',
-                'summary': self.generate_realistic_summary('Task', pi, art),
-                'status': status,
-                'priority': random.choice(self.priorities),
-                'workstream': workstream,
-                'labels': self.generate_labels(pi, art, 'Task'),
-                'story_points': self.generate_story_points('Task'),
-                'created_date': created_date,
-                'resolved_date': resolved_date,
-                'parent_key': None
-            }
-            issues.append(issue)
-            issue_index += 1
-        
-        return pd.DataFrame(issues)
+        """Generate main issues table in one pass over every issue type"""
+        issue_types = self.generated_types
+        counts = [num_features, num_stories, num_bugs, num_tasks]
+        n = sum(counts)
+        itype_code = np.repeat(np.arange(len(issue_types)), counts)
+        is_feature = itype_code == issue_types.index('Feature')
+        is_story = itype_code == issue_types.index('Story')
+        
+        # Sample every issue's category codes in one draw per column
+        pi_idx = self._sample(len(self.pis), n)
+        art_idx = self._sample(len(self.arts), n)
+        workstream_idx = self._sample(len(self.workstreams), n)
+        status_idx = self._draw(self.status_cum, itype_code * len(self.pis) + pi_idx)
+        priority_idx = self._draw(self.priority_cum, itype_code)
+        story_points = self.story_point_values[self._draw(self.story_point_cum, itype_code)]
+        created_date, resolved_date = self.generate_dates(pi_idx, status_idx)
+        
+        # Summary templates differ per issue type
+        summary = np.empty(n, dtype=object)
+        for code, issue_type in enumerate(issue_types):
+            in_type = itype_code == code
+            summary[in_type] = self.generate_realistic_summaries(issue_type, pi_idx[in_type], art_idx[in_type])
+        
+        keys = self.generate_issue_keys(np.array(issue_types)[itype_code])
+        
+        # 60% of stories belong to a feature from the same PI
+        parent_key = np.full(n, None, dtype=object)
+        linked = is_story & (self.rng.random(n) < 0.6)
+        for pi_code in range(len(self.pis)):
+            feature_keys = keys[is_feature & (pi_idx == pi_code)]
+            to_link = linked & (pi_idx == pi_code)
+            if len(feature_keys) and to_link.any():
+                parent_key[to_link] = self.rng.choice(feature_keys, size=to_link.sum())
+        
+        # Nullable int8 story points; features are left unestimated
+        story_points = pd.array(story_points, dtype=pd.Int8Dtype())
+        story_points[is_feature] = pd.NA
+        
+        label_columns = self.generate_label_columns(pi_idx, art_idx, is_feature)
+        obj_num = pd.array(label_columns.pop('obj_num'), dtype='Int64')
+        obj_num[obj_num == 0] = pd.NA
+        
+        itype_categories = np.array([self.issue_types.index(t) for t in issue_types])
+        return pd.DataFrame({
+            'key': keys,
+            'issuetype': pd.Categorical.from_codes(itype_categories[itype_code], categories=self.issue_types),
+            'summary': summary,
+            'status': pd.Categorical.from_codes(status_idx, categories=self.statuses),
+            'priority': pd.Categorical.from_codes(priority_idx, categories=self.priorities),
+            'workstream': pd.Categorical.from_codes(workstream_idx, categories=self.workstreams),
+            'labels': label_columns.pop('labels'),
+            'story_points': story_points,
+            'created_date': created_date,
+            'resolved_date': resolved_date,
+            'parent_key': parent_key,
+            'pi': pd.Categorical.from_codes(pi_idx, categories=self.pis),
+            'art': pd.Categorical.from_codes(art_idx, categories=self.art_labels),
+            'obj_num': obj_num,
+            **label_columns
+        })
     
     def generate_changelog(self, issues_df):
         """Generate changelog entries for status transitions"""
-        changelog = []
-        
-        for _, issue in issues_df.iterrows():
-            created_date = issue['created_date']
-            resolved_date = issue['resolved_date']
-            current_status = issue['status']
-            
-            # Generate realistic status progression
-            status_flow = ['To Do', 'In Progress', 'In Review', 'Done']
-            
-            if current_status == 'Blocked':
-                # Blocked issues have different flow
-                transitions = ['To Do', 'In Progress', 'Blocked']
-            else:
-                # Find how far through the flow this issue got
-                if current_status in status_flow:
-                    end_index = status_flow.index(current_status)
-                    transitions = status_flow[:end_index + 1]
-                else:
-                    transitions = ['To Do', current_status]
-            
-            # Generate changelog entries for each transition
-            current_date = created_date
-            for i, status in enumerate(transitions):
-                if i == 0:
-                    # Initial creation
-                    changelog.append({
-                        'issue_key': issue['key'],
-                        'field': 'status',
-                        'from_value': None,
-                        'to_value': status,
-                        'changed_date': current_date
-                    })
-                else:
-                    # Status transitions
-                    if resolved_date and status == 'Done':
-                        transition_date = resolved_date
-                    else:
-                        # Random date between current and resolved (or PI end)
-                        max_date = resolved_date if resolved_date else current_date + timedelta(days=30)
-                        days_diff = (max_date - current_date).days
-                        if days_diff > 0:
-                            transition_date = current_date + timedelta(
-                                days=random.randint(1, max(1, days_diff))
-                            )
-                        else:
-                            transition_date = current_date + timedelta(days=1)
-                    
-                    changelog.append({
-                        'issue_key': issue['key'],
-                        'field': 'status',
-                        'from_value': transitions[i-1],
-                        'to_value': status,
-                        'changed_date': transition_date
-                    })
-                    current_date = transition_date
-            
-            # Add some label changes (scope changes)
-            if random.random() < 0.15:  # 15% of issues have label changes
-                label_change_date = created_date + timedelta(
-                    days=random.randint(1, 14)
-                )
-                
-                old_labels = issue['labels']
-                # Simulate PI scope changes
-                if 'PI-2024-Q3' in old_labels and random.random() < 0.5:
-                    new_labels = old_labels.replace('PI-2024-Q3', 'PI-2024-Q4')
-                else:
-                    new_labels = old_labels + ', urgent'
-                
-                changelog.append({
-                    'issue_key': issue['key'],
-                    'field': 'labels',
-                    'from_value': old_labels,
-                    'to_value': new_labels,
-                    'changed_date': label_change_date
-                })
-        
-        return pd.DataFrame(changelog)
+        n = len(issues_df)
+        status = issues_df['status'].to_numpy(dtype=str)
+        created = issues_df['created_date'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+        resolved_date = issues_df['resolved_date'].to_numpy(dtype='datetime64[D]')
+        has_resolved = ~np.isnat(resolved_date)
+        resolved = resolved_date.astype(np.int64)
+        
+        # Generate realistic status progression, one path per issue
+        status_flow = np.array(['To Do', 'In Progress', 'In Review', 'Done'], dtype=object)
+        in_flow = status[:, None] == status_flow.astype(str)
+        is_blocked = status == 'Blocked'
+        
+        paths = np.tile(status_flow, (n, 1))
+        # Blocked issues have different flow
+        paths[is_blocked, 2] = 'Blocked'
+        other = ~in_flow.any(axis=1) & ~is_blocked
+        paths[other, 1] = status[other]
+        
+        # Find how far through the flow each issue got
+        n_trans = np.where(is_blocked, 3, np.where(other, 2, in_flow.argmax(axis=1) + 1))
+        
+        # Transition dates, stepping every issue forward one position at a time
+        dates = np.empty(paths.shape, dtype=np.int64)
+        dates[:, 0] = current = created
+        for i in range(1, paths.shape[1]):
+            # Random date between current and resolved (or 30 days on)
+            max_date = np.where(has_resolved, resolved, current + 30)
+            days_diff = max_date - current
+            step = np.where(days_diff > 0, self.rng.integers(1, np.maximum(days_diff, 1) + 1), 1)
+            current = np.where(has_resolved & (paths[:, i] == 'Done'), resolved, current + step)
+            dates[:, i] = current
+        
+        # Expand to one row per transition
+        row = np.repeat(np.arange(n), n_trans)
+        position = np.arange(n_trans.sum()) - np.repeat(np.cumsum(n_trans) - n_trans, n_trans)
+        
+        transitions = pd.DataFrame({
+            'issue_key': issues_df['key'].to_numpy()[row],
+            'field': 'status',
+            'from_value': np.where(position > 0, paths[row, np.maximum(position - 1, 0)], None),
+            'to_value': paths[row, position],
+            'changed_date': self._days_to_datetime(dates[row, position])
+        })
+        
+        # Add some label changes (scope changes) to 15% of issues
+        changed = self.rng.random(n) < 0.15
+        old_labels = issues_df['labels'].to_numpy(dtype=str)[changed]
+        pi_code = issues_df['pi'].cat.codes.to_numpy()[changed]
+        
+        # Simulate PI scope changes: half of the Q3 issues move to Q4, the rest gain an urgent label
+        q3, q4 = self.pis.index('PI-2024-Q3'), self.pis.index('PI-2024-Q4')
+        moved = (pi_code == q3) & (self.rng.random(changed.sum()) < 0.5)
+        pi_code = np.where(moved, q4, pi_code)
+        
+        # Labels always lead with the PI, so a move swaps that prefix
+        _, separator, other_labels = np.char.partition(old_labels, ', ').T
+        new_labels = np.where(
+            moved,
+            self._concat(self.pi_names[pi_code], separator, other_labels),
+            np.char.add(old_labels, ', urgent')
+        )
+        label_change_date = created[changed] + self.rng.integers(1, 15, size=changed.sum())
+        
+        label_changes = pd.DataFrame({
+            'issue_key': issues_df['key'].to_numpy()[changed],
+            'field': 'labels',
+            'from_value': old_labels,
+            'to_value': new_labels,
+            'changed_date': self._days_to_datetime(label_change_date)
+        })
+        
+        return pd.concat([transitions, label_changes], ignore_index=True)
     
     def generate_issue_links(self, issues_df):
         """Generate issue links for dependencies"""
-        links = []
-        
         features = issues_df[issues_df['issuetype'] == 'Feature']
         stories = issues_df[issues_df['issuetype'] == 'Story']
         
         # Epic-Story links
-        for _, story in stories.iterrows():
-            if story['parent_key']:
-                links.append({
-                    'source_key': story['parent_key'],
-                    'target_key': story['key'],
-                    'link_type': 'Epic-Story'
-                })
-        
-        # Feature dependencies (cross-ART)
-        for _, feature in features.iterrows():
-            if random.random() < 0.3:  # 30% of features have dependencies
-                # Find potential dependency targets (different ART)
-                feature_art = None
-                for label in feature['labels'].split(', '):
-                    if label.startswith('ART-'):
-                        feature_art = label
-                        break
-                
-                if feature_art:
-                    other_features = features[
-                        (features['key'] != feature['key']) & 
-                        (~features['labels'].str.contains(feature_art, na=False))
-                    ]
-                    
-                    if not other_features.empty:
-                        target = other_features.sample(1).iloc[0]
-                        links.append({
-                            'source_key': feature['key'],
-                            'target_key': target['key'],
-                            'link_type': 'Dependency'
-                        })
-        
-        return pd.DataFrame(links)
+        epic_links = pd.DataFrame({
+            'source_key': stories.loc[stories['parent_key'].notna(), 'parent_key'].to_numpy(),
+            'target_key': stories.loc[stories['parent_key'].notna(), 'key'].to_numpy(),
+            'link_type': 'Epic-Story'
+        })
+        
+        # Feature dependencies (cross-ART) for 30% of features
+        feature_keys = features['key'].to_numpy()
+        feature_arts = features['art'].cat.codes.to_numpy()
+        art_to_indices = {art: np.flatnonzero(feature_arts == art) for art in range(len(self.arts))}
+        # Every feature outside an ART, built once per ART rather than scanned per feature
+        other_art_pools = {
+            art: np.concatenate([art_to_indices[other] for other in art_to_indices if other != art])
+            for art in art_to_indices
+        }
+        has_dependency = self.rng.random(len(features)) < 0.3
+        
+        sources, targets = [], []
+        for art, members in art_to_indices.items():
+            source_idx = members[has_dependency[members]]
+            if len(source_idx) and len(other_art_pools[art]):
+                sources.append(source_idx)
+                targets.append(self.rng.choice(other_art_pools[art], size=len(source_idx)))
+        
+        sources = np.concatenate(sources) if sources else np.array([], dtype=int)
+        targets = np.concatenate(targets) if targets else np.array([], dtype=int)
+        order = np.argsort(sources, kind='stable')
+        
+        dependency_links = pd.DataFrame({
+            'source_key': feature_keys[sources[order]],
+            'target_key': feature_keys[targets[order]],
+            'link_type': 'Dependency'
+        })
+        
+        return pd.concat([epic_links, dependency_links], ignore_index=True)
     
     def create_test_database(self, db_path=":memory:"):
         """Create complete test database with all tables"""
@@ -435,10 +422,18 @@ class JiraTestDataGenerator:
         # Create database
         conn = duckdb.connect(db_path)
         
-        # Create and populate tables
-        conn.execute("CREATE TABLE issues AS SELECT * FROM issues_df")
-        conn.execute("CREATE TABLE changelog AS SELECT * FROM changelog_df")
-        conn.execute("CREATE TABLE issue_links AS SELECT * FROM links_df")
+        # Create and populate tables in a single transaction, scanning Arrow buffers directly
+        tables = {'issues': issues_df, 'changelog': changelog_df, 'issue_links': links_df}
+        conn.execute("BEGIN TRANSACTION")
+        for name, df in tables.items():
+            # Categoricals arrive as ENUMs; store them as VARCHAR so the dashboards can rewrite pi/art in place
+            categorical = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+            columns = f"* REPLACE ({', '.join(f'CAST({c} AS VARCHAR) AS {c}' for c in categorical)})" if categorical else "*"
+            conn.register(f"{name}_arrow", pa.Table.from_pandas(df, preserve_index=False))
+            conn.execute(f"CREATE TABLE {name} AS SELECT {columns} FROM {name}_arrow")
+            conn.unregister(f"{name}_arrow")
+        conn.execute("COMMIT")
+        conn.execute("CREATE INDEX idx_issues_type ON issues(issuetype)")
         
         print(f"✅ Created test database at {db_path}")
         
@@ -466,35 +461,33 @@ class JiraTestDataGenerator:
         
         # Issues by PI
         result = conn.execute("""
-        SELECT 
-            REGEXP_EXTRACT(labels, 'PI-([^,]+)') as pi,
-            COUNT(*) as count 
+        SELECT pi, COUNT(*) as count 
         FROM issues 
-        WHERE labels LIKE '%PI-%'
-        GROUP BY REGEXP_EXTRACT(labels, 'PI-([^,]+)')
+        WHERE pi IS NOT NULL
+        GROUP BY pi
         ORDER BY pi
         """).fetchall()
         
         print("\nFeatures by PI:")
         for pi, count in result:
-            print(f"  PI-{pi}: {count}")
+            print(f"  {pi}: {count}")
         
         # Completion rates
         result = conn.execute("""
         SELECT 
-            REGEXP_EXTRACT(labels, 'PI-([^,]+)') as pi,
+            pi,
             COUNT(*) as total,
-            COUNT(CASE WHEN status = 'Done' THEN 1 END) as completed,
-            ROUND(100.0 * COUNT(CASE WHEN status = 'Done' THEN 1 END) / COUNT(*), 1) as completion_rate
+            COUNT(*) FILTER (WHERE status = 'Done') as completed,
+            ROUND(100.0 * COUNT(*) FILTER (WHERE status = 'Done') / COUNT(*), 1) as completion_rate
         FROM issues 
-        WHERE issuetype = 'Feature' AND labels LIKE '%PI-%'
-        GROUP BY REGEXP_EXTRACT(labels, 'PI-([^,]+)')
+        WHERE issuetype = 'Feature' AND pi IS NOT NULL
+        GROUP BY pi
         ORDER BY pi
         """).fetchall()
         
         print("\nFeature Completion Rates:")
         for pi, total, completed, rate in result:
-            print(f"  PI-{pi}: {completed}/{total} ({rate}%)")
+            print(f"  {pi}: {completed}/{total} ({rate}%)")
 
 if __name__ == "__main__":
     # Generate test database